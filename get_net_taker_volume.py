@@ -1,32 +1,98 @@
 import datetime as dt
-import multiprocessing as mp
+import os
 import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from enum import Enum
+from functools import partial
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
 import typer
 from rich.console import Console
 
 from src.aggtrades_fetcher import MarketType
+from src.aggtrades_store import get_file_path, list_day_files
 
 app = typer.Typer(help="计算加密货币交易的净吃单量", add_completion=False)
 console = Console()
 
+# 计算净吃单量所需的交易数据列
+TRADE_COLUMNS = ["timestamp", "price", "quantity", "is_buyer_maker"]
+
+# 净吃单量结果的列
+BAR_COLUMNS = ["open", "high", "low", "close", "volume", "net_taker_volume"]
+
 
 class ResampleFrequency(str, Enum):
     """
     数据重采样的频率，成员的值与 pandas.resample 的重采样频率相对应。
+
+    每个成员同时记录区间长度的纳秒数，计算区间边界时无需再解析频率字符串。
+    """
+
+    nanoseconds: int
+
+    def __new__(cls, value: str, nanoseconds: int) -> "ResampleFrequency":
+        obj = str.__new__(cls, value)
+        obj._value_ = value
+        obj.nanoseconds = nanoseconds
+        return obj
+
+    ONE_MINUTE = ("1min", 60 * 10**9)  # 1 分钟
+    FIVE_MINUTES = ("5min", 5 * 60 * 10**9)  # 5 分钟
+    FIFTEEN_MINUTES = ("15min", 15 * 60 * 10**9)  # 15 分钟
+    THIRTY_MINUTES = ("30min", 30 * 60 * 10**9)  # 30 分钟
+    ONE_HOUR = ("1h", 60 * 60 * 10**9)  # 1 小时
+    FOUR_HOURS = ("4h", 4 * 60 * 60 * 10**9)  # 4 小时
+    ONE_DAY = ("D", 24 * 60 * 60 * 10**9)  # 1 天
+
+
+def _get_cache_dir(
+    data_dir: str,
+    symbol: str,
+    market_type: MarketType,
+    frequency: ResampleFrequency,
+) -> Path:
+    """获取单日净吃单量计算结果的缓存目录。
+
+    Args:
+        data_dir: 数据目录路径
+        symbol: 交易对符号
+        market_type: 市场类型
+        frequency: 重采样频率
+
+    Returns:
+        缓存目录路径，目录下每天一个 YYYYMMDD.parquet 文件
     """
+    return (
+        Path(data_dir)
+        / ".cache"
+        / f"{market_type.value}"
+        / f"{symbol}"
+        / f"{frequency.value}"
+    )
+
+
+def _read_trades_table(data_path: Path) -> pa.Table:
+    """以Arrow表的形式读取聚合交易数据文件。
+
+    Args:
+        data_path: 数据文件路径
 
-    ONE_MINUTE = "1min"  # 1 分钟
-    FIVE_MINUTES = "5min"  # 5 分钟
-    FIFTEEN_MINUTES = "15min"  # 15 分钟
-    THIRTY_MINUTES = "30min"  # 30 分钟
-    ONE_HOUR = "1h"  # 1 小时
-    FOUR_HOURS = "4h"  # 4 小时
-    ONE_DAY = "D"  # 1 天
+    Returns:
+        仅包含计算净吃单量所需列的Arrow表
+    """
+    # 只读取计算所需的列，跳过其余列的解码；pre_buffer 合并所选列块的读取请求，
+    # 多线程并行解码各列块
+    return pq.read_table(
+        data_path, columns=TRADE_COLUMNS, use_threads=True, pre_buffer=True
+    )
 
 
 def read_daily_aggtrades(
@@ -44,25 +110,165 @@ def read_daily_aggtrades(
         market_type: 市场数据类型，spot, futures
 
     Returns:
-        包含该日期所有聚合交易数据的DataFrame，按时间戳排序
+        包含该日期聚合交易数据的DataFrame，仅包含计算净吃单量所需的列
 
     Raises:
         FileNotFoundError: 当指定日期的数据目录不存在时抛出
         ValueError: 当指定日期没有找到任何数据文件时抛出
     """
-    data_path = (
-        Path(data_dir)
-        / f"{market_type.value}"
-        / f"{symbol}"
-        / f"{date.year:04d}"
-        / f"{date.month:02d}"
-        / f"{symbol}_{date:%Y%m%d}.parquet"
-    )
+    data_path = get_file_path(data_dir, market_type, symbol, date)
 
     if not data_path.exists():
         raise FileNotFoundError(f"无法找到文件: {data_path}")
 
-    return pd.read_parquet(data_path)
+    # 每列单独转换为 numpy 数组，不合并成二维数据块，配合 self_destruct 边转换边释放
+    table = _read_trades_table(data_path)
+    df = table.to_pandas(split_blocks=True, self_destruct=True)
+
+    # 统一转换为 numpy 原生类型，避免后续计算走可空类型的慢路径
+    return df.astype(
+        {"price": np.float64, "quantity": np.float64, "is_buyer_maker": np.bool_},
+        copy=False,
+    )
+
+
+def _compute_bin_edges(
+    first_timestamp: int,
+    last_timestamp: int,
+    frequency: ResampleFrequency,
+    tz: Optional[Union[str, dt.tzinfo]] = None,
+) -> np.ndarray:
+    """计算覆盖给定时间范围的区间边界。
+
+    区间边界与 resample 的默认对齐方式一致，从第一笔交易所在日期的本地零点开始。
+    按日重采样时区间为本地日历日，夏令时切换当天的区间不是24小时；
+    其余频率从零点起按固定长度划分。
+
+    Args:
+        first_timestamp: 第一笔交易的时间戳（int64纳秒）
+        last_timestamp: 最后一笔交易的时间戳（int64纳秒）
+        frequency: 重采样频率
+        tz: 交易数据的时区，为None时按UTC对齐
+
+    Returns:
+        区间边界数组（int64纳秒，UTC），长度为区间数量+1
+    """
+    first_day = (
+        pd.Timestamp(first_timestamp, tz="UTC").tz_convert(tz or "UTC").normalize()
+    )
+
+    if frequency is ResampleFrequency.ONE_DAY:
+        last_day = (
+            pd.Timestamp(last_timestamp, tz="UTC").tz_convert(tz or "UTC").normalize()
+        )
+        num_days = (last_day.date() - first_day.date()).days + 1
+        return pd.date_range(first_day, periods=num_days + 1, freq="D").asi8
+
+    step = frequency.nanoseconds
+    origin = first_day.value
+    first_edge = origin + (first_timestamp - origin) // step * step
+    num_bins = (last_timestamp - first_edge) // step + 1
+
+    return first_edge + step * np.arange(num_bins + 1, dtype="int64")
+
+
+def _aggregate_bins(
+    timestamps: np.ndarray,
+    price: np.ndarray,
+    quantity: np.ndarray,
+    is_buyer_maker: np.ndarray,
+    bin_edges: np.ndarray,
+) -> np.ndarray:
+    """在已排序的交易数据上按时间区间一次性计算高开低收、成交量和净吃单量。
+
+    通过 searchsorted 定位每个区间的起止位置，再对非空区间使用 ufunc.reduceat
+    分段归约，每一列只扫描一次。空区间的价格为NaN，成交量和净吃单量为0。
+
+    Args:
+        timestamps: 按升序排列的交易时间戳（int64纳秒）
+        price: 交易价格
+        quantity: 交易数量
+        is_buyer_maker: 买方是否为挂单方
+        bin_edges: 区间边界（int64纳秒），长度为区间数量+1
+
+    Returns:
+        形状为 (区间数量, 6) 的数组，各列依次为 open, high, low, close, volume,
+        net_taker_volume
+    """
+    num_bins = len(bin_edges) - 1
+
+    # 一次 searchsorted 得到所有边界位置，相邻两个位置即为区间的起止
+    boundaries = np.searchsorted(timestamps, bin_edges, side="left")
+    starts = boundaries[:-1]
+    ends = boundaries[1:]
+    non_empty = ends > starts
+    segment_starts = starts[non_empty]
+
+    # 带符号的成交量：买入吃单为正，卖出吃单为负，原地取反避免额外的临时数组
+    signed_quantity = quantity.copy()
+    np.negative(signed_quantity, out=signed_quantity, where=is_buyer_maker)
+
+    # 按列存储的输出矩阵，每列连续，可直接作为DataFrame的数据块而无需复制
+    result = np.empty((num_bins, len(BAR_COLUMNS)), order="F")
+    result[:, :4] = np.nan
+    result[:, 4:] = 0.0
+
+    if len(segment_starts) == 0:
+        return result
+
+    result[non_empty, 0] = price[segment_starts]
+    result[non_empty, 1] = np.maximum.reduceat(price, segment_starts)
+    result[non_empty, 2] = np.minimum.reduceat(price, segment_starts)
+    result[non_empty, 3] = price[ends[non_empty] - 1]
+    result[non_empty, 4] = np.add.reduceat(quantity, segment_starts)
+    result[non_empty, 5] = np.add.reduceat(signed_quantity, segment_starts)
+
+    return result
+
+
+def _build_bars(
+    timestamps: np.ndarray,
+    price: np.ndarray,
+    quantity: np.ndarray,
+    is_buyer_maker: np.ndarray,
+    frequency: ResampleFrequency,
+    tz: Optional[Union[str, dt.tzinfo]],
+) -> pd.DataFrame:
+    """根据交易数据的各列数组生成按时间区间聚合的结果。
+
+    Args:
+        timestamps: 交易时间戳（int64纳秒，UTC）
+        price: 交易价格
+        quantity: 交易数量
+        is_buyer_maker: 买方是否为挂单方
+        frequency: 重采样频率
+        tz: 输出索引的时区，为None时输出不带时区的索引
+
+    Returns:
+        包含净吃单量的DataFrame，以区间开始时间为索引
+    """
+    if len(timestamps) == 0:
+        return pd.DataFrame(columns=BAR_COLUMNS, dtype="float64")
+
+    if np.any(timestamps[1:] < timestamps[:-1]):
+        order = np.argsort(timestamps, kind="stable")
+        timestamps = timestamps[order]
+        price = price[order]
+        quantity = quantity[order]
+        is_buyer_maker = is_buyer_maker[order]
+
+    bin_edges = _compute_bin_edges(timestamps[0], timestamps[-1], frequency, tz)
+
+    result = _aggregate_bins(timestamps, price, quantity, is_buyer_maker, bin_edges)
+
+    # 先转换到输出时区再设置频率，按日的区间在本地时间下才是等间隔的
+    index = pd.DatetimeIndex(
+        pd.to_datetime(bin_edges[:-1], unit="ns", utc=True), name="timestamp"
+    )
+    index = index.tz_convert(tz) if tz is not None else index.tz_localize(None)
+    index = pd.DatetimeIndex(index, freq=frequency.value)
+
+    return pd.DataFrame(result, index=index, columns=BAR_COLUMNS, copy=False)
 
 
 def calculate_net_taker_volume(
@@ -70,63 +276,122 @@ def calculate_net_taker_volume(
 ) -> pd.DataFrame:
     """计算指定时间范围内的净吃单量。
 
+    按时间排序后计算区间边界，在一次遍历中得到每个区间的高开低收、成交量和
+    净吃单量，区间划分与 pandas.resample 的结果保持一致。
+
     Args:
         trades: 包含交易数据的DataFrame
-        timeframe: 时间范围
+        frequency: 重采样频率
 
     Returns:
-        包含净吃单量的DataFrame
+        包含净吃单量的DataFrame，以区间开始时间为索引
     """
+    if trades.empty:
+        return pd.DataFrame(columns=BAR_COLUMNS, dtype="float64")
+
+    return _build_bars(
+        trades["timestamp"].to_numpy(dtype="datetime64[ns]").view("int64"),
+        trades["price"].to_numpy(dtype="float64"),
+        trades["quantity"].to_numpy(dtype="float64"),
+        trades["is_buyer_maker"].to_numpy(dtype=bool),
+        frequency,
+        trades["timestamp"].dt.tz,
+    )
+
+
+def _calculate_net_taker_volume_table(
+    table: pa.Table, frequency: ResampleFrequency
+) -> pd.DataFrame:
+    """直接在Arrow表上计算净吃单量，跳过交易数据转换为DataFrame的步骤。
+
+    Args:
+        table: 包含交易数据的Arrow表
+        frequency: 重采样频率
+
+    Returns:
+        包含净吃单量的DataFrame，以区间开始时间为索引
+    """
+    timestamp_type = table.schema.field("timestamp").type
+
+    return _build_bars(
+        table.column("timestamp")
+        .cast(pa.timestamp("ns", tz=timestamp_type.tz))
+        .to_numpy()
+        .view("int64"),
+        table.column("price").cast(pa.float64()).to_numpy(),
+        table.column("quantity").cast(pa.float64()).to_numpy(),
+        table.column("is_buyer_maker").cast(pa.bool_()).to_numpy(),
+        frequency,
+        timestamp_type.tz,
+    )
 
-    def _resample(df: pd.DataFrame) -> pd.Series:
-        """对DataFrame进行重采样并计算净吃单量。"""
-        # 买入吃单，is_buyer_maker=false，卖方使用限价单，买方使用市价单主动买入
-        taker_buy_volume = df.query("is_buyer_maker == False")["quantity"].sum()
-
-        # 卖出吃单，is_buyer_maker=true，买方使用限价单，卖方使用市价单主动卖出
-        taker_sell_volume = df.query("is_buyer_maker == True")["quantity"].sum()
-
-        # 净吃单量，单位是计价货币
-        net_taker_volume = taker_buy_volume - taker_sell_volume
-
-        return pd.Series(
-            {
-                "open": df["price"].iloc[0],
-                "high": df["price"].max(),
-                "low": df["price"].min(),
-                "close": df["price"].iloc[-1],
-                "volume": df["quantity"].sum(),
-                "net_taker_volume": net_taker_volume,
-            }
-        )
 
-    res = trades.set_index("timestamp").resample(frequency.value).apply(_resample)
+# 当前进程是否已经提示过缓存写入失败，避免每个日期重复提示
+_cache_write_warned = False
 
-    return res
+
+def _write_cache(daily_result: pd.DataFrame, cache_path: Path) -> None:
+    """将单日计算结果写入缓存文件。
+
+    先写入临时文件再重命名，避免中断时留下不完整的缓存。缓存写入失败
+    （如只读或共享的数据目录）不影响计算结果，只提示一次并跳过。
+
+    Args:
+        daily_result: 单日计算结果
+        cache_path: 缓存文件路径
+    """
+    global _cache_write_warned
+
+    tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        daily_result.to_parquet(tmp_path, compression="zstd")
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        try:
+            tmp_path.unlink(missing_ok=True)
+        except OSError:
+            pass
+        if not _cache_write_warned:
+            _cache_write_warned = True
+            console.print(f"无法写入缓存，将不使用缓存继续处理: {e}", style="yellow")
 
 
 def _process_single_date(
     date: dt.date,
-    data_dir: str,
-    symbol: str,
-    market_type: MarketType,
+    data_path: Path,
     frequency: ResampleFrequency,
+    cache_dir: Optional[Path] = None,
 ) -> Optional[pd.DataFrame]:
     """读取并处理单日数据，计算净吃单量。
 
+    指定缓存目录时，计算结果会缓存为 YYYYMMDD.parquet 文件，当缓存文件比
+    原始交易数据新时直接读取缓存，避免重复计算。
+
     Args:
         date: 要处理的日期
-        data_dir: 数据目录路径
-        symbol: 交易对符号
-        market_type: 市场类型
+        data_path: 该日期的聚合交易数据文件路径
         frequency: 重采样频率
+        cache_dir: 单日计算结果的缓存目录，为None时不使用缓存
 
     Returns:
         处理后的DataFrame，如果处理失败则返回None
     """
     try:
-        df = read_daily_aggtrades(data_dir, symbol, date, market_type)
-        daily_result = calculate_net_taker_volume(df, frequency)
+        cache_path = None
+        if cache_dir is not None:
+            cache_path = cache_dir / f"{date:%Y%m%d}.parquet"
+            if (
+                cache_path.exists()
+                and cache_path.stat().st_mtime >= data_path.stat().st_mtime
+            ):
+                return pd.read_parquet(cache_path)
+
+        table = _read_trades_table(data_path)
+        daily_result = _calculate_net_taker_volume_table(table, frequency)
+
+        if cache_path is not None:
+            _write_cache(daily_result, cache_path)
+
         return daily_result
     except Exception as e:
         console.print(f"处理 {date} 的数据时发生错误: {e}", style="yellow")
@@ -141,9 +406,14 @@ def process_date_range(
     market_type: MarketType = MarketType.SPOT,
     frequency: ResampleFrequency = ResampleFrequency.ONE_HOUR,
     processes: int = 1,
+    threads: int = 1,
+    use_cache: bool = True,
 ) -> pd.DataFrame:
     """处理指定日期范围内的交易数据并计算净吃单量。
 
+    单进程模式下可以使用线程池同时处理多个日期，parquet 解码和数组归约
+    都会释放GIL，读取文件和计算可以相互重叠。
+
     Args:
         data_dir: 数据目录路径
         symbol: 交易对符号
@@ -152,40 +422,63 @@ def process_date_range(
         market_type: 市场类型，默认为现货
         frequency: 重采样频率，默认为1小时
         processes: 用于并行处理的进程数
+        threads: 单进程模式下用于并行处理的线程数
+        use_cache: 是否读写单日计算结果的缓存
 
     Returns:
         包含净吃单量的DataFrame
     """
-    # 计算日期范围
-    date_range = [
-        start_date + dt.timedelta(days=i)
-        for i in range((end_date - start_date).days + 1)
-    ]
+    # 一次性列出日期范围内的数据文件，缺失的日期直接跳过
+    files = list_day_files(
+        data_dir, market_type, symbol, start_date, end_date + dt.timedelta(days=1)
+    )
+    num_missing = (end_date - start_date).days + 1 - len(files)
+    if num_missing > 0:
+        console.print(f"{num_missing} 天没有找到数据文件，已跳过", style="yellow")
+
+    dates = sorted(files)
+    data_paths = [files[date] for date in dates]
+
+    cache_dir = None
+    if use_cache:
+        cache_dir = _get_cache_dir(data_dir, symbol, market_type, frequency)
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            if not os.access(cache_dir, os.W_OK):
+                raise PermissionError(f"缓存目录不可写: {cache_dir}")
+        except OSError as e:
+            # 数据目录只读或为共享挂载时，不使用缓存继续处理
+            console.print(f"无法使用缓存目录，将不使用缓存: {e}", style="yellow")
+            cache_dir = None
+
+    process_date = partial(
+        _process_single_date, frequency=frequency, cache_dir=cache_dir
+    )
 
-    # 使用多进程并行处理
+    # 使用多进程并行处理，每个任务包含多个日期，减少进程间通信的次数。
+    # 结果按日期顺序逐个取回，取回时即丢弃失败的日期，不再保留完整的中间列表
     if processes > 1:
-        with mp.Pool(processes=processes) as pool:
-            all_data = pool.starmap(
-                _process_single_date,
-                [
-                    (date, data_dir, symbol, market_type, frequency)
-                    for date in date_range
-                ],
-            )
+        chunksize = max(1, len(dates) // (4 * processes))
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            results = executor.map(process_date, dates, data_paths, chunksize=chunksize)
+            all_data = [df for df in results if df is not None]
+    elif threads > 1:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = executor.map(process_date, dates, data_paths)
+            all_data = [df for df in results if df is not None]
     else:
-        all_data = [
-            _process_single_date(date, data_dir, symbol, market_type, frequency)
-            for date in date_range
-        ]
-
-    # 过滤掉None值
-    all_data = [df for df in all_data if df is not None]
+        results = map(process_date, dates, data_paths)
+        all_data = [df for df in results if df is not None]
 
     if not all_data:
         raise Exception(f"No data found")
 
-    # 合并所有日期的数据
-    result = pd.concat(all_data)
+    # 合并所有日期的数据，日期按顺序处理且每天的结果各自有序，合并后无需再排序。
+    # 每天的结果列相同且都是 float64，直接拼接底层数组，跳过 pd.concat 的对齐和块合并
+    values = np.concatenate([df.to_numpy() for df in all_data])
+    index = all_data[0].index.append([df.index for df in all_data[1:]])
+    result = pd.DataFrame(values, index=index, columns=BAR_COLUMNS, copy=False)
+    assert result.index.is_monotonic_increasing
 
     return result
 
@@ -213,6 +506,44 @@ def generate_output_filename(
     return f"{base_name}.csv"
 
 
+def save_result_csv(result: pd.DataFrame, filename: str) -> None:
+    """使用 pyarrow 的多线程CSV写入器保存结果，索引作为第一列写入。
+
+    输出与 ``DataFrame.to_csv`` 基本一致：表头不加引号，索引按 pandas 的文本
+    格式写入（如 ``2025-01-01 00:00:00+08:00``），整数值的浮点数保留 ``.0``，
+    读回时仍是浮点列。科学计数法的写法可能不同（``1e-7`` 而非 ``1e-07``），
+    数值不变。
+
+    Args:
+        result: 包含净吃单量的DataFrame
+        filename: 输出文件名
+    """
+    table = pa.Table.from_pandas(result, preserve_index=False)
+    for position, column in enumerate(table.columns):
+        if pa.types.is_floating(column.type):
+            text = pc.cast(column, pa.string())
+            # pyarrow 把 100.0 写成 100，补上小数部分以免读回时被推断为整数列
+            is_integral = pc.match_substring_regex(text, r"^-?\d+$")
+            text = pc.if_else(
+                is_integral, pc.binary_join_element_wise(text, ".0", ""), text
+            )
+            table = table.set_column(position, table.field(position).name, text)
+    table = table.add_column(
+        0, result.index.name or "", pa.array(result.index.astype(str))
+    )
+    # pyarrow 总是给表头加引号，因此表头自行写入，数据行交给 pyarrow
+    header = ",".join(table.column_names) + "\n"
+    with pa.OSFile(filename, "wb") as sink:
+        sink.write(header.encode())
+        pa_csv.write_csv(
+            table,
+            sink,
+            write_options=pa_csv.WriteOptions(
+                include_header=False, quoting_style="none"
+            ),
+        )
+
+
 @app.command()
 def main(
     data_dir: str = typer.Option(..., help="存储交易数据的文件夹路径"),
@@ -234,7 +565,9 @@ def main(
         ResampleFrequency.ONE_HOUR, help="重采样频率"
     ),
     processes: int = typer.Option(1, help="用于并行处理的进程数"),
+    threads: int = typer.Option(4, help="单进程模式下用于并行处理的线程数"),
     group_by_year: bool = typer.Option(False, help="是否按年份分组保存数据"),
+    use_cache: bool = typer.Option(True, help="是否缓存单日计算结果"),
 ) -> None:
     """计算指定日期范围内的净吃单量并输出结果。"""
     start_date = start_date.date()
@@ -247,15 +580,24 @@ def main(
     try:
         # 并行处理数据
         result = process_date_range(
-            data_dir, symbol, start_date, end_date, market_type, frequency, processes
+            data_dir,
+            symbol,
+            start_date,
+            end_date,
+            market_type,
+            frequency,
+            processes,
+            threads,
+            use_cache,
         )
 
-        # 展示结果
-        console.print("\n结果汇总:", style="bold")
-        console.print("\n前面5行:", style="bold")
-        console.print(result.head())
-        console.print("\n后面5行:", style="bold")
-        console.print(result.tail())
+        # 展示结果，输出被重定向时跳过，避免无用的表格格式化
+        if console.is_terminal:
+            console.print("\n结果汇总:", style="bold")
+            console.print("\n前面5行:", style="bold")
+            console.print(result.head().to_string())
+            console.print("\n后面5行:", style="bold")
+            console.print(result.tail().to_string())
 
         # 保存结果
         if group_by_year:
@@ -264,12 +606,12 @@ def main(
                 filename = generate_output_filename(
                     symbol, market_type, frequency, year
                 )
-                year_data.to_csv(filename, index=True)
+                save_result_csv(year_data, filename)
                 console.print(f"\n{year}年数据已保存至: {filename}")
         else:
             # 保存为单个文件
             filename = generate_output_filename(symbol, market_type, frequency)
-            result.to_csv(filename, index=True)
+            save_result_csv(result, filename)
             console.print(f"\n结果已保存至: {filename}")
 
         console.print(f"\n任务完成，耗时 {time.time() - t0:.2f} 秒")
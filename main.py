@@ -114,7 +114,7 @@ def download(
         "-t",
         help="下载线程数",
         min=1,
-        max=10,
+        max=32,
     ),
 ) -> None:
     """下载Binance交易所的聚合历史交易数据。"""
@@ -128,16 +128,10 @@ def download(
     # 创建数据获取器
     fetcher = AggTradesFetcherFactory.create_fetcher(data_source, market_type)
 
-    # 按交易对组织任务
-    symbol_tasks: Dict[str, List[dt.date]] = {}
+    # 按交易对组织任务，所有交易对共用同一个日期列表
     symbols = symbols.upper().split(",")
-
-    for symbol in symbols:
-        symbol_tasks[symbol] = []
-        current_date = start
-        while current_date <= end:
-            symbol_tasks[symbol].append(current_date)
-            current_date += dt.timedelta(days=1)
+    dates = [start + dt.timedelta(days=i) for i in range((end - start).days + 1)]
+    symbol_tasks: Dict[str, List[dt.date]] = {symbol: dates for symbol in symbols}
 
     # 存储错误信息，当进度条完成后再显示，不打断进度条
     errors = []
@@ -2,14 +2,20 @@
 
 import datetime as dt
 import io
+import threading
 import time
 import zipfile
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 from typing import Dict, List, Type
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 import requests
+from requests.adapters import HTTPAdapter
 from tenacity import (
     retry,
     stop_after_attempt,
@@ -21,31 +27,51 @@ from tenacity import (
 def convert_mixed_timestamps(timestamps: pd.Series) -> pd.Series:
     """将混合格式（毫秒/微秒）的时间戳序列转换为datetime格式。
 
+    按数值范围判断位数，统一换算为纳秒后直接视为 datetime64[ns]，
+    避免先转换为字符串计算长度，也避免多次调用 to_datetime 重新解析。
+
     Args:
         timestamps: 包含时间戳的pandas Series
 
     Returns:
         转换后的datetime格式时间戳Series（UTC时区）
     """
-    # 检查时间戳长度
-    timestamp_length = timestamps.astype(str).str.len()
-    is_13_digit = timestamp_length == 13
-    is_16_digit = timestamp_length == 16
+    values = timestamps.to_numpy(dtype="int64")
 
-    # 创建结果序列，假设单位是纳秒并设置errors='coerce'，忽略错误
-    result = pd.to_datetime(timestamps, unit="ns", utc=True, errors="coerce")
+    # 13位时间戳（毫秒）和16位时间戳（微秒），其余按纳秒处理
+    is_13_digit = (values >= 10**12) & (values < 10**13)
+    is_16_digit = (values >= 10**15) & (values < 10**16)
 
-    # 处理13位时间戳
-    result.loc[is_13_digit] = pd.to_datetime(
-        timestamps.loc[is_13_digit], unit="ms", utc=True
-    )
+    nanoseconds = values.copy()
+    np.multiply(nanoseconds, 1_000_000, out=nanoseconds, where=is_13_digit)
+    np.multiply(nanoseconds, 1_000, out=nanoseconds, where=is_16_digit)
 
-    # 处理16位时间戳
-    result.loc[is_16_digit] = pd.to_datetime(
-        timestamps.loc[is_16_digit], unit="us", utc=True
+    return pd.Series(
+        pd.DatetimeIndex(nanoseconds.view("datetime64[ns]")).tz_localize("UTC"),
+        index=timestamps.index,
+        name=timestamps.name,
     )
 
-    return result
+
+def _create_session(pool_size: int = 32) -> requests.Session:
+    """创建复用连接的HTTP会话。
+
+    同一主机的请求复用TCP和TLS连接，连接池大小需要覆盖并发请求的线程数。
+    重试由 tenacity 负责，连接适配器本身不重试。
+
+    Args:
+        pool_size: 每个主机的连接池大小
+
+    Returns:
+        配置好连接池的HTTP会话
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
 
 
 class DataSource(str, Enum):
@@ -81,14 +107,29 @@ class AggTradesFetcher(ABC):
         pass
 
 
+# API获取器同时发出的最大请求数。现货接口每个IP的请求权重上限为每分钟6000，
+# aggTrades 每次请求的权重为2，即每秒最多约50次请求。每个并发名额在请求返回后
+# 还要等待 request_delay（默认0.05秒），按单次请求往返约0.1秒计算，
+# 4个并发每秒约27次请求，权重约为上限的一半，为同一IP下的其他请求留出余量
+MAX_CONCURRENT_REQUESTS = 4
+
+
 class APIAggTradesFetcher(AggTradesFetcher):
     """通过API获取聚合交易数据"""
 
-    def __init__(self, market_type: MarketType = MarketType.SPOT):
+    def __init__(
+        self,
+        market_type: MarketType = MarketType.SPOT,
+        max_concurrent_requests: int = MAX_CONCURRENT_REQUESTS,
+    ):
         """初始化API获取器
 
+        同一获取器的所有请求共享一个并发上限，无论调用方和 fetch_daily_trades
+        各自使用多少线程，同时进行的请求数都不会超过该上限。
+
         Args:
             market_type: 市场类型，默认为现货
+            max_concurrent_requests: 同时进行的最大请求数
 
         Raises:
             NotImplementedError: 当选择尚未实现的市场类型时
@@ -102,6 +143,8 @@ class APIAggTradesFetcher(AggTradesFetcher):
             )
 
         self.base_url = self._get_base_url()
+        self.session = _create_session(pool_size=max_concurrent_requests)
+        self._request_slots = threading.BoundedSemaphore(max_concurrent_requests)
 
     def _get_base_url(self) -> str:
         """根据市场类型获取基础URL
@@ -158,11 +201,20 @@ class APIAggTradesFetcher(AggTradesFetcher):
                 "limit": limit,
             }
 
-            response = requests.get(self.base_url, params=params)
+            # 请求间隔在持有并发名额时等待，总请求频率受并发上限约束。
+            # 设置超时，避免无响应的连接一直占用名额，超时后由 tenacity 重试
+            with self._request_slots:
+                response = self.session.get(self.base_url, params=params, timeout=3)
+                time.sleep(request_delay)
             response.raise_for_status()
             return response.json()
 
-        all_trades = []
+        # 按列累积各页数据，避免从字典列表构造DataFrame时逐行推断类型
+        trade_ids: List[int] = []
+        timestamps: List[int] = []
+        prices: List[str] = []
+        quantities: List[str] = []
+        buyer_maker_flags: List[bool] = []
         current_end = end_ts
 
         while True:
@@ -170,11 +222,13 @@ class APIAggTradesFetcher(AggTradesFetcher):
             if not trades:
                 break
 
-            # 按时间戳升序排序
-            trades.sort(key=lambda x: x["T"])
-
+            # API按时间升序返回每一页，无需在Python中逐页排序
             # 添加到集合中
-            all_trades.extend(trades)
+            trade_ids.extend(trade["a"] for trade in trades)
+            timestamps.extend(trade["T"] for trade in trades)
+            prices.extend(trade["p"] for trade in trades)
+            quantities.extend(trade["q"] for trade in trades)
+            buyer_maker_flags.extend(trade["m"] for trade in trades)
 
             if len(trades) < limit:
                 # 少于限制数量意味着已获取所有交易
@@ -187,60 +241,70 @@ class APIAggTradesFetcher(AggTradesFetcher):
             if start_ts >= end_ts:
                 break
 
-            time.sleep(request_delay)
-
-        if not all_trades:
+        if not trade_ids:
             return pd.DataFrame()
 
-        # 转换为DataFrame
-        df = pd.DataFrame(all_trades)
-        df = df.rename(
-            columns={
-                "a": "trade_id",
-                "T": "timestamp",
-                "p": "price",
-                "q": "quantity",
-                "m": "is_buyer_maker",
+        # 一次性按列构造DataFrame，直接指定数据类型
+        df = pd.DataFrame(
+            {
+                "trade_id": np.asarray(trade_ids, dtype="int64"),
+                "timestamp": pd.to_datetime(
+                    np.asarray(timestamps, dtype="int64"), unit="ms", utc=True
+                ),
+                "price": np.asarray(prices, dtype="float64"),
+                "quantity": np.asarray(quantities, dtype="float64"),
+                "is_buyer_maker": np.asarray(buyer_maker_flags, dtype="bool"),
             }
         )
 
-        # 转换数据类型
-        df["trade_id"] = df["trade_id"].astype("int64")
-        df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms", utc=True)
-        df["price"] = df["price"].astype("float64")
-        df["quantity"] = df["quantity"].astype("float64")
-        df["is_buyer_maker"] = df["is_buyer_maker"].astype("bool")
+        timestamps_ns = df["timestamp"].to_numpy(dtype="datetime64[ns]").view("int64")
 
-        # 按时间戳排序
-        df = df.sort_values("timestamp")
+        # 各页数据已按时间升序排列，只有在顺序被打乱时才按索引整体重排一次
+        if not df["timestamp"].is_monotonic_increasing:
+            order = np.argsort(timestamps_ns, kind="stable")
+            df = df.take(order)
+            timestamps_ns = timestamps_ns[order]
 
-        # 确保交易严格在请求的小时内
-        df = df[
-            (df["timestamp"] >= pd.Timestamp(start_dt, tz="UTC"))
-            & (df["timestamp"] < pd.Timestamp(end_dt, tz="UTC"))
-        ]
+        # 确保交易严格在请求的小时内，数据有序，二分查找边界后切片即可，
+        # 不需要对每一列应用布尔掩码
+        lower = pd.Timestamp(start_dt, tz="UTC").value
+        upper = pd.Timestamp(end_dt, tz="UTC").value
+        start, stop = np.searchsorted(timestamps_ns, [lower, upper], side="left")
 
-        return df[["trade_id", "timestamp", "price", "quantity", "is_buyer_maker"]]
+        return df.iloc[start:stop]
 
     def fetch_daily_trades(
-        self, symbol: str, date: dt.date, limit: int = 1000, request_delay: float = 0.05
+        self,
+        symbol: str,
+        date: dt.date,
+        limit: int = 1000,
+        request_delay: float = 0.05,
+        max_workers: int = 4,
     ) -> pd.DataFrame:
         """获取指定日期的所有聚合交易数据
 
+        每个小时的数据相互独立，使用线程池并发获取，重叠各个请求的网络延迟。
+        实际同时进行的请求数受获取器的并发上限约束，避免触发API的请求频率限制。
+
         Args:
             symbol: 交易对名称
             date: 日期
             limit: 每次请求的交易数量限制
             request_delay: 请求间隔时间(秒)
+            max_workers: 并发获取的小时数
 
         Returns:
             包含聚合交易数据的DataFrame
         """
-        all_trades = []
-
-        for hour in range(24):
-            df = self.fetch_hourly_trades(symbol, date, hour, limit, request_delay)
-            all_trades.append(df)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            all_trades = list(
+                executor.map(
+                    lambda hour: self.fetch_hourly_trades(
+                        symbol, date, hour, limit, request_delay
+                    ),
+                    range(24),
+                )
+            )
 
         return (
             pd.concat(all_trades, ignore_index=True) if all_trades else pd.DataFrame()
@@ -268,6 +332,7 @@ class HistoricalAggTradesFetcher(AggTradesFetcher):
             )
 
         self.base_url = self._get_base_url()
+        self.session = _create_session()
 
     def _get_base_url(self) -> str:
         """根据市场类型获取基础URL
@@ -325,33 +390,60 @@ class HistoricalAggTradesFetcher(AggTradesFetcher):
         url = f"{self.base_url}/{symbol}/{filename}"
 
         # 下载文件
-        response = requests.get(url, stream=True, timeout=3)
+        response = self.session.get(url, stream=True, timeout=3)
         response.raise_for_status()  # 如果是404等错误，这里会抛出异常，不会重试
 
-        # 使用内存中的BytesIO对象处理zip文件，避免写入磁盘
-        with zipfile.ZipFile(io.BytesIO(response.content)) as zip_file:
+        # 按块流式写入内存缓冲区，避免 response.content 先缓存所有数据块再拼接，
+        # 使用BytesIO对象处理zip文件，避免写入磁盘
+        buffer = io.BytesIO()
+        for chunk in response.iter_content(chunk_size=1 << 20):
+            buffer.write(chunk)
+        buffer.seek(0)
+
+        with zipfile.ZipFile(buffer) as zip_file:
             # 获取zip文件中的CSV文件名（通常只有一个文件）
             csv_files = [name for name in zip_file.namelist() if name.endswith(".csv")]
             csv_filename = csv_files[0]
 
-            # 读取CSV文件内容
+            # 读取CSV文件内容，使用 pyarrow 多线程解析，注意没有表头
             with zip_file.open(csv_filename) as csv_file:
-                # 读取CSV数据，注意没有表头
-                df = pd.read_csv(
+                table = pa_csv.read_csv(
                     csv_file,
-                    header=None,
-                    names=[
-                        "trade_id",
-                        "price",
-                        "quantity",
-                        "first_trade_id",
-                        "last_trade_id",
-                        "timestamp",
-                        "is_buyer_maker",
-                        "is_best_price_match",
-                    ],
+                    read_options=pa_csv.ReadOptions(
+                        column_names=[
+                            "trade_id",
+                            "price",
+                            "quantity",
+                            "first_trade_id",
+                            "last_trade_id",
+                            "timestamp",
+                            "is_buyer_maker",
+                            "is_best_price_match",
+                        ],
+                        use_threads=True,
+                        block_size=1 << 22,
+                    ),
+                    convert_options=pa_csv.ConvertOptions(
+                        column_types={
+                            "trade_id": pa.int64(),
+                            "price": pa.float64(),
+                            "quantity": pa.float64(),
+                            "timestamp": pa.int64(),
+                            "is_buyer_maker": pa.bool_(),
+                        },
+                        # 解析时直接跳过不需要的列
+                        include_columns=[
+                            "trade_id",
+                            "timestamp",
+                            "price",
+                            "quantity",
+                            "is_buyer_maker",
+                        ],
+                    ),
                 )
 
+        df = table.to_pandas(self_destruct=True)
+
         # 处理日期字段，有时候会返回13位数字的时间戳（毫秒），有时候是16位数字（微秒）
         df["timestamp"] = convert_mixed_timestamps(df["timestamp"])
 
@@ -1,14 +1,24 @@
 """存储聚合历史交易数据。"""
 
 import datetime as dt
+import itertools
+import os
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Dict, Iterator, Optional, Set, Tuple
 
+import numpy as np
 import pandas as pd
 import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.fs as fs
 import pyarrow.parquet as pq
 
 from .aggtrades_fetcher import MarketType
 
+EPOCH_DATE = dt.date(1970, 1, 1)
+
 
 def get_file_path(
     base_dir: str, market_type: MarketType, symbol: str, date: dt.date
@@ -24,22 +34,271 @@ def get_file_path(
     Returns:
         完整的文件路径
     """
-    return (
-        Path(base_dir)
-        / market_type.value
-        / symbol
-        / f"{date.year}"
-        / f"{date.month:02d}"
-        / f"{symbol}_{date:%Y%m%d}.parquet"
+    # 先拼接完整路径字符串再构造一次Path，比逐级使用 / 拼接快约三倍
+    return Path(
+        f"{base_dir}/{market_type.value}/{symbol}/{date.year}/{date.month:02d}/"
+        f"{symbol}_{date.year}{date.month:02d}{date.day:02d}.parquet"
     )
 
 
+# 交易数据各列的存储类型。币安的交易时间最高为微秒精度，按微秒存储时
+# 相邻时间戳的差值比纳秒小三个数量级，差分编码后占用的位数更少
+TRADE_SCHEMA = pa.schema(
+    [
+        ("trade_id", pa.int64()),
+        ("timestamp", pa.timestamp("us", tz="UTC")),
+        ("price", pa.float64()),
+        ("quantity", pa.float64()),
+        ("is_buyer_maker", pa.bool_()),
+    ]
+)
+
+# 单调递增的整数列使用差分编码，体积远小于字典编码或直接存储
+DELTA_ENCODED_COLUMNS = ["trade_id", "timestamp"]
+
+# zstd 的压缩级别，压缩率高于 snappy，解压速度相近
+ZSTD_COMPRESSION_LEVEL = 3
+
+# 每个行组的行数，按时间范围读取时可以跳过整个不相关的行组
+ROW_GROUP_SIZE = 200_000
+
+
+def _to_table(trades_df: pd.DataFrame) -> pa.Table:
+    """将交易数据转换为Arrow表，并把已知列转换为 TRADE_SCHEMA 中的类型。
+
+    行索引只是下载结果中的行号，不需要存储。不带时区的时间戳按UTC处理。
+    时间戳以微秒精度存储（Binance 提供的最高精度），带有亚微秒部分的
+    时间戳无法无损转换，会被拒绝而不是静默截断。
+
+    Args:
+        trades_df: 包含交易数据的DataFrame
+
+    Returns:
+        待写入的Arrow表
+
+    Raises:
+        ValueError: 如果某列无法无损转换为 TRADE_SCHEMA 中的类型
+    """
+    table = pa.Table.from_pandas(trades_df, preserve_index=False)
+
+    for field in TRADE_SCHEMA:
+        index = table.schema.get_field_index(field.name)
+        if index >= 0 and table.schema.field(index).type != field.type:
+            try:
+                column = table.column(index).cast(field.type)
+            except pa.ArrowInvalid as e:
+                raise ValueError(
+                    f"列 {field.name} 无法无损转换为 {field.type}: {e}"
+                ) from e
+            table = table.set_column(index, field.name, column)
+
+    return table.replace_schema_metadata(None)
+
+
+def _writer_options(schema: pa.Schema, compression: str) -> dict:
+    """生成写入parquet文件时的编码参数。
+
+    交易ID和时间戳按时间单调递增，使用 DELTA_BINARY_PACKED 编码，
+    其余列保持字典编码。数据按时间戳排序写入，并在文件尾部记录排序列。
+
+    Args:
+        schema: 待写入数据的Arrow表结构
+        compression: 压缩算法
+
+    Returns:
+        传给 pq.write_table / pq.ParquetWriter 的关键字参数
+    """
+    column_encoding = {
+        name: "DELTA_BINARY_PACKED"
+        for name in DELTA_ENCODED_COLUMNS
+        if name in schema.names
+    }
+    use_dictionary = [name for name in schema.names if name not in column_encoding]
+    sorting_columns = (
+        pq.SortingColumn.from_ordering(schema, [("timestamp", "ascending")])
+        if "timestamp" in schema.names
+        else None
+    )
+
+    return {
+        "compression": compression,
+        "compression_level": (
+            ZSTD_COMPRESSION_LEVEL if compression == "zstd" else None
+        ),
+        "use_dictionary": use_dictionary,
+        "column_encoding": column_encoding,
+        "write_statistics": True,
+        "sorting_columns": sorting_columns,
+    }
+
+
+@contextmanager
+def _atomic_path(file_path: Path) -> Iterator[Path]:
+    """提供写入用的临时文件路径，写入成功后原子替换目标文件。
+
+    读取方不会看到写入到一半的文件；写入失败时删除临时文件，原文件保持不变。
+
+    Args:
+        file_path: 目标文件路径
+
+    Yields:
+        与目标文件位于同一目录的临时文件路径
+    """
+    tmp_path = file_path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        yield tmp_path
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _write_table(table: pa.Table, file_path: Path, compression: str) -> None:
+    """将Arrow表写入parquet文件。
+
+    Args:
+        table: 待写入的Arrow表
+        file_path: 目标文件路径
+        compression: 压缩算法
+    """
+    with _atomic_path(file_path) as tmp_path:
+        pq.write_table(
+            table,
+            tmp_path,
+            row_group_size=ROW_GROUP_SIZE,
+            **_writer_options(table.schema, compression),
+        )
+
+
+def _write_frame(trades_df: pd.DataFrame, file_path: Path, compression: str) -> None:
+    """将交易数据逐个行组转换为Arrow格式并写入parquet文件。
+
+    每次只转换一个行组的数据，不需要同时持有整个交易日的Arrow表，
+    峰值内存只比DataFrame本身多一个行组。
+
+    Args:
+        trades_df: 包含交易数据的DataFrame
+        file_path: 目标文件路径
+        compression: 压缩算法
+    """
+    with _atomic_path(file_path) as tmp_path:
+        writer = None
+        try:
+            for start in range(0, len(trades_df), ROW_GROUP_SIZE):
+                table = _to_table(trades_df.iloc[start : start + ROW_GROUP_SIZE])
+                if writer is None:
+                    writer = pq.ParquetWriter(
+                        tmp_path,
+                        table.schema,
+                        **_writer_options(table.schema, compression),
+                    )
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+
+
+def _max_trade_id(parquet_file: pq.ParquetFile) -> Optional[int]:
+    """从parquet文件尾部的行组统计信息中获取最大交易ID。
+
+    Args:
+        parquet_file: 已打开的parquet文件
+
+    Returns:
+        最大交易ID，缺少统计信息时返回None
+    """
+    column_index = parquet_file.schema_arrow.get_field_index("trade_id")
+    if column_index < 0:
+        return None
+
+    metadata = parquet_file.metadata
+    max_trade_id = None
+    for i in range(metadata.num_row_groups):
+        statistics = metadata.row_group(i).column(column_index).statistics
+        if statistics is None or not statistics.has_min_max:
+            return None
+        if max_trade_id is None or statistics.max > max_trade_id:
+            max_trade_id = statistics.max
+
+    return max_trade_id
+
+
+def _append_row_group(table: pa.Table, file_path: Path, compression: str) -> bool:
+    """将新数据作为新的行组追加到已有parquet文件之后。
+
+    仅当新数据的交易ID严格递增且全部大于已有数据时才能直接追加，此时不存在重复，
+    也不会打乱时间顺序。已有的行组逐个流式写入临时文件后原子替换原文件，
+    无需合并、去重和排序整个交易日的数据。
+
+    Args:
+        table: 待追加的Arrow表
+        file_path: 已有的parquet文件路径
+        compression: 压缩算法
+
+    Returns:
+        是否成功追加，返回False时需要调用方合并后重写
+    """
+    parquet_file = pq.ParquetFile(file_path)
+    schema = parquet_file.schema_arrow
+    if not schema.equals(table.schema, check_metadata=False):
+        return False
+
+    max_trade_id = _max_trade_id(parquet_file)
+    if max_trade_id is None or pc.min(table["trade_id"]).as_py() <= max_trade_id:
+        return False
+
+    # 新数据自身的交易ID也必须严格递增，否则其中存在重复，需要合并去重
+    trade_ids = table["trade_id"].combine_chunks()
+    if not pc.all(pc.greater(pc.pairwise_diff(trade_ids), 0)).as_py():
+        return False
+
+    with _atomic_path(file_path) as tmp_path, pq.ParquetWriter(
+        tmp_path, schema, **_writer_options(schema, compression)
+    ) as writer:
+        for i in range(parquet_file.num_row_groups):
+            writer.write_table(parquet_file.read_row_group(i))
+        writer.write_table(table.cast(schema), row_group_size=ROW_GROUP_SIZE)
+
+    return True
+
+
+def _merge_tables(existing: pa.Table, table: pa.Table) -> pa.Table:
+    """合并已有数据和新数据，按交易ID去重并按时间戳排序。
+
+    去重和排序都在Arrow表上完成，不经过pandas。交易ID重复时保留已有数据。
+
+    Args:
+        existing: 已有的交易数据
+        table: 新的交易数据，与已有数据的表结构相同
+
+    Returns:
+        合并后的Arrow表
+    """
+    combined = pa.concat_tables([existing, table])
+
+    # 稳定排序后，同一交易ID的行相邻且已有数据在前，只保留每组的第一行
+    order = pc.sort_indices(combined, sort_keys=[("trade_id", "ascending")])
+    trade_ids = combined["trade_id"].take(order).combine_chunks()
+    is_first = pc.fill_null(pc.not_equal(pc.pairwise_diff(trade_ids), 0), True)
+    combined = combined.take(order.filter(is_first))
+
+    # 交易ID通常与时间顺序一致，已有序时跳过按时间戳排序
+    timestamps = combined["timestamp"].to_numpy()
+    if np.any(timestamps[1:] < timestamps[:-1]):
+        combined = combined.take(
+            pc.sort_indices(combined, sort_keys=[("timestamp", "ascending")])
+        )
+
+    return combined
+
+
 def write_trades(
     base_dir: str,
     market_type: MarketType,
     symbol: str,
     trades_df: pd.DataFrame,
     overwrite: bool = False,
+    compression: str = "zstd",
 ) -> None:
     """将交易数据写入存储。
 
@@ -49,9 +308,10 @@ def write_trades(
         symbol: 交易对符号
         trades_df: 包含交易数据的DataFrame
         overwrite: 是否覆盖现有数据
+        compression: parquet 文件的压缩算法
 
     Raises:
-        ValueError: 如果trades_df为空或结构无效
+        ValueError: 如果trades_df结构无效，或时间戳带有亚微秒部分
     """
     if trades_df.empty:
         return
@@ -59,35 +319,128 @@ def write_trades(
     # 确保基础目录存在
     Path(base_dir).mkdir(parents=True, exist_ok=True)
 
-    # 按日分组并写入单独的文件
-    for date, day_df in trades_df.groupby(trades_df.timestamp.dt.date):
+    # 按日分组并写入单独的文件，分组键为自1970-01-01起的天数，
+    # 避免为每一行构造 datetime.date 对象
+    timestamps = trades_df["timestamp"]
+    if timestamps.dt.tz is not None:
+        timestamps = timestamps.dt.tz_localize(None)
+    day_numbers = timestamps.to_numpy().astype("datetime64[D]").view("int64")
+
+    # 下载器每次写入一个交易日的数据，只有一天时跳过分组
+    if day_numbers.min() == day_numbers.max():
+        day_groups = [(day_numbers[0], trades_df)]
+    else:
+        day_groups = trades_df.groupby(day_numbers)
+
+    for day_number, day_df in day_groups:
+        date = EPOCH_DATE + dt.timedelta(days=int(day_number))
         file_path = get_file_path(base_dir, market_type, symbol, date)
         file_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # 转换为Arrow表
-        table = pa.Table.from_pandas(day_df)
-
-        # 检查文件是否存在并处理覆盖
-        if file_path.exists():
-            if overwrite:
-                file_path.unlink()  # 删除现有文件
-            else:
-                # 如果不覆盖但需要追加，则读取现有数据，合并后重写
-                existing_df = pd.read_parquet(file_path)
-                combined_df = pd.concat([existing_df, day_df]).drop_duplicates(
-                    subset=["trade_id"]
-                )
-                combined_df = combined_df.sort_values("timestamp")
-                table = pa.Table.from_pandas(combined_df)
-                pq.write_table(table, file_path, compression="snappy")
+        # 行组按时间戳排序写入，下载的数据通常已有序，此时跳过排序
+        if not day_df["timestamp"].is_monotonic_increasing:
+            day_df = day_df.sort_values("timestamp", kind="mergesort")
+
+        # 文件已存在且不覆盖时，与现有数据合并
+        if not overwrite and file_path.exists():
+            table = _to_table(day_df)
+
+            # 新数据完全位于已有数据之后时，直接追加为新的行组
+            if _append_row_group(table, file_path, compression):
                 continue
 
-        # 直接存储数据
-        pq.write_table(
-            table,
-            file_path,
-            compression="snappy",
-        )
+            # 否则读取现有数据，统一类型后合并重写
+            existing = pq.read_table(file_path, columns=table.column_names)
+            table = _merge_tables(existing.cast(table.schema), table)
+            _write_table(table, file_path, compression)
+            continue
+
+        # 直接存储数据，覆盖时原子替换现有文件
+        _write_frame(day_df, file_path, compression)
+
+
+def list_day_files(
+    base_dir: str,
+    market_type: MarketType,
+    symbol: str,
+    start_date: dt.date,
+    end_date: dt.date,
+) -> Dict[dt.date, Path]:
+    """列出日期范围内已存在的交易日文件。
+
+    每个月份目录只扫描一次，逐日检查文件名是否在扫描结果中，
+    不再为每一天单独调用 stat 检查文件是否存在。
+
+    Args:
+        base_dir: 数据存储的基础目录
+        market_type: 市场类型
+        symbol: 交易对符号
+        start_date: 开始日期（包含）
+        end_date: 结束日期（不包含）
+
+    Returns:
+        按日期排序的日期到文件路径的字典
+    """
+    file_paths: Dict[dt.date, Path] = {}
+    month_files: Dict[Tuple[int, int], Set[str]] = {}
+    current_date = start_date
+
+    while current_date < end_date:
+        file_path = get_file_path(base_dir, market_type, symbol, current_date)
+
+        month = (current_date.year, current_date.month)
+        if month not in month_files:
+            try:
+                with os.scandir(file_path.parent) as entries:
+                    month_files[month] = {
+                        entry.name for entry in entries if entry.is_file()
+                    }
+            except FileNotFoundError:
+                month_files[month] = set()
+
+        if file_path.name in month_files[month]:
+            file_paths[current_date] = file_path
+
+        current_date += dt.timedelta(days=1)
+
+    return file_paths
+
+
+def _is_file_inside(
+    file_path: str, start_time: dt.datetime, end_time: dt.datetime
+) -> bool:
+    """根据文件尾部的行组统计信息判断文件中的交易是否全部位于时间范围内。
+
+    文件按写入数据的本地日期划分，不一定对应UTC的一整天，
+    因此使用实际存储的最小和最大时间戳判断，而不是文件对应的日期。
+
+    Args:
+        file_path: 交易日文件路径
+        start_time: 开始时间戳（包含）
+        end_time: 结束时间戳（不包含）
+
+    Returns:
+        文件中的所有交易是否都在时间范围内，缺少统计信息时返回False
+    """
+    metadata = pq.read_metadata(file_path)
+    schema = metadata.schema.to_arrow_schema()
+    column_index = schema.get_field_index("timestamp")
+    if column_index < 0:
+        return False
+
+    # 统计信息中的原始值是存储单位下的整数，时间范围按同一类型换算后比较
+    timestamp_type = schema.field(column_index).type
+    start_value = pa.scalar(start_time, type=timestamp_type).value
+    end_value = pa.scalar(end_time, type=timestamp_type).value
+
+    for i in range(metadata.num_row_groups):
+        statistics = metadata.row_group(i).column(column_index).statistics
+        if statistics is None or not statistics.has_min_max:
+            return False
+        if statistics.min_raw < start_value or statistics.max_raw >= end_value:
+            return False
+
+    return True
 
 
 def read_trades(
@@ -99,6 +452,10 @@ def read_trades(
 ) -> pd.DataFrame:
     """读取给定时间范围内的交易数据。
 
+    时间范围内的交易日文件作为数据集统一扫描，时间过滤条件下推到
+    parquet 读取层，根据行组统计信息跳过不在范围内的行组。根据文件尾部统计信息
+    判断交易全部位于时间范围内的文件不需要逐行比较时间戳，与其余文件分开扫描。
+
     Args:
         base_dir: 数据存储的基础目录
         market_type: 市场类型
@@ -109,8 +466,6 @@ def read_trades(
     Returns:
         包含交易数据的DataFrame
     """
-    dfs = []
-
     # 计算日期范围
     start_date = start_time.date()
     end_date = end_time.date()
@@ -119,17 +474,48 @@ def read_trades(
     if end_time.time() != dt.time(0, 0, 0):
         end_date += dt.timedelta(days=1)
 
-    current_date = start_date
+    file_paths = [
+        str(file_path)
+        for file_path in list_day_files(
+            base_dir, market_type, symbol, start_date, end_date
+        ).values()
+    ]
+    if not file_paths:
+        return pd.DataFrame()
 
-    while current_date < end_date:
-        file_path = get_file_path(base_dir, market_type, symbol, current_date)
+    # 通过内存映射读取，重复查询时直接使用页缓存中的数据，无需再复制到读缓冲区
+    filesystem = fs.LocalFileSystem(use_mmap=True)
+    schema = ds.dataset(file_paths, format="parquet", filesystem=filesystem).schema
 
-        if file_path.exists():
-            df = pd.read_parquet(file_path)
-            df = df[(df.timestamp >= start_time) & (df.timestamp < end_time)]
-            if not df.empty:
-                dfs.append(df)
+    # 时间范围转换为与存储列相同的类型后再比较
+    timestamp_type = schema.field("timestamp").type
+    start_value = pa.scalar(start_time, type=timestamp_type)
+    end_value = pa.scalar(end_time, type=timestamp_type)
+    timestamp = ds.field("timestamp")
+    in_range = (timestamp >= start_value) & (timestamp < end_value)
 
-        current_date += dt.timedelta(days=1)
+    # 旧版本写入的文件包含pandas行索引列，读取时跳过
+    columns = [name for name in schema.names if not name.startswith("__index_level_")]
+
+    # 按日期顺序把连续的交易日文件分段扫描，只有部分交易位于时间范围内的文件
+    # 需要过滤，各段结果按顺序合并后的数据按时间排序
+    tables = []
+    for inside, run in itertools.groupby(
+        file_paths,
+        key=lambda file_path: _is_file_inside(file_path, start_time, end_time),
+    ):
+        dataset = ds.dataset(
+            list(run),
+            schema=schema,
+            format="parquet",
+            filesystem=filesystem,
+        )
+        tables.append(
+            dataset.to_table(columns=columns, filter=None if inside else in_range)
+        )
+
+    table = pa.concat_tables(tables)
+    if table.num_rows == 0:
+        return pd.DataFrame()
 
-    return pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame()
+    return table.to_pandas()
@@ -6,6 +6,7 @@ import sys
 from pathlib import Path
 
 import pandas as pd
+import pyarrow.parquet as pq
 import pytest
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -208,3 +209,162 @@ def test_read_trades_time_filter(test_data_dir, sample_trades_df):
     # 验证只读取了指定时间范围的数据
     assert len(read_df) == 2
     assert set(read_df.trade_id) == {2, 3}
+
+
+def test_write_trades_append_out_of_order(test_data_dir, sample_trades_df):
+    """测试追加早于已有数据的交易时，写入结果仍按时间排序。
+
+    Args:
+        test_data_dir: 测试数据目录
+        sample_trades_df: 样本交易数据
+    """
+    # 测试参数
+    market_type = MarketType.SPOT
+    symbol = "BTCUSDT"
+
+    # 先写入较晚的交易，再追加较早的交易
+    write_trades(test_data_dir, market_type, symbol, sample_trades_df.iloc[3:])
+    write_trades(
+        test_data_dir, market_type, symbol, sample_trades_df.iloc[:3], overwrite=False
+    )
+
+    # 读取数据
+    start_time = dt.datetime(2023, 1, 1, 10, 0, 0)
+    end_time = dt.datetime(2023, 1, 1, 10, 30, 0)
+    read_df = read_trades(test_data_dir, market_type, symbol, start_time, end_time)
+
+    # 验证数据完整且按时间排序
+    assert list(read_df.trade_id) == [1, 2, 3, 4, 5]
+    assert read_df.timestamp.is_monotonic_increasing
+
+
+def test_read_trades_multiple_days(test_data_dir):
+    """测试跨多个交易日读取数据时结果完整且按时间排序。
+
+    Args:
+        test_data_dir: 测试数据目录
+    """
+    # 测试参数
+    market_type = MarketType.SPOT
+    symbol = "BTCUSDT"
+
+    # 创建跨越三天的交易数据，每天两笔
+    timestamps = [
+        dt.datetime(2023, 1, day, hour, 0, 0) for day in (1, 2, 3) for hour in (6, 18)
+    ]
+    trades_df = pd.DataFrame(
+        {
+            "trade_id": range(1, len(timestamps) + 1),
+            "price": 100.0,
+            "qty": 1.0,
+            "timestamp": timestamps,
+            "is_buyer_maker": False,
+        }
+    )
+    write_trades(test_data_dir, market_type, symbol, trades_df)
+
+    # 读取从第一天中午到第三天中午的数据
+    start_time = dt.datetime(2023, 1, 1, 12, 0, 0)
+    end_time = dt.datetime(2023, 1, 3, 12, 0, 0)
+    read_df = read_trades(test_data_dir, market_type, symbol, start_time, end_time)
+
+    # 验证只包含时间范围内的数据，且按时间排序
+    assert list(read_df.trade_id) == [2, 3, 4, 5]
+    assert read_df.timestamp.is_monotonic_increasing
+
+
+def test_read_trades_multiple_days_non_utc(test_data_dir):
+    """测试非UTC时区的数据跨多个交易日读取时，结果严格位于时间范围内。
+
+    Args:
+        test_data_dir: 测试数据目录
+    """
+    # 测试参数
+    market_type = MarketType.SPOT
+    symbol = "BTCUSDT"
+
+    # 创建五天的每分钟交易数据，按东八区的本地日期分文件存储
+    timestamps = pd.date_range(
+        "2023-01-01", periods=5 * 1440, freq="min", tz="Asia/Shanghai"
+    )
+    trades_df = pd.DataFrame(
+        {
+            "trade_id": range(1, len(timestamps) + 1),
+            "price": 100.0,
+            "qty": 1.0,
+            "timestamp": timestamps,
+            "is_buyer_maker": False,
+        }
+    )
+    write_trades(test_data_dir, market_type, symbol, trades_df)
+
+    # 读取从第二天凌晨四点到第四天零点（东八区）的数据
+    tz = dt.timezone(dt.timedelta(hours=8))
+    start_time = dt.datetime(2023, 1, 2, 4, 0, 0, tzinfo=tz)
+    end_time = dt.datetime(2023, 1, 4, 0, 0, 0, tzinfo=tz)
+    read_df = read_trades(test_data_dir, market_type, symbol, start_time, end_time)
+
+    # 验证只包含时间范围内的数据，且按时间排序
+    assert len(read_df) == 2640
+    assert read_df.timestamp.min() == pd.Timestamp(start_time)
+    assert read_df.timestamp.max() < pd.Timestamp(end_time)
+    assert read_df.timestamp.is_monotonic_increasing
+
+
+def test_write_trades_append_row_group(test_data_dir, sample_trades_df):
+    """测试追加较新的交易时作为新行组写入，重叠或重复的交易仍会去重。
+
+    Args:
+        test_data_dir: 测试数据目录
+        sample_trades_df: 样本交易数据
+    """
+    # 测试参数
+    market_type = MarketType.SPOT
+    symbol = "BTCUSDT"
+    file_path = get_file_path(test_data_dir, market_type, symbol, dt.date(2023, 1, 1))
+
+    # 交易ID不重叠时直接追加为新的行组
+    write_trades(test_data_dir, market_type, symbol, sample_trades_df.iloc[:3])
+    write_trades(
+        test_data_dir, market_type, symbol, sample_trades_df.iloc[3:], overwrite=False
+    )
+    assert pq.ParquetFile(file_path).num_row_groups == 2
+
+    # 交易ID重叠时合并去重后重写
+    write_trades(
+        test_data_dir, market_type, symbol, sample_trades_df.iloc[2:], overwrite=False
+    )
+
+    # 新数据自身包含重复的交易ID时同样去重
+    duplicated_df = sample_trades_df.iloc[[0, 1, 1, 2]].copy()
+    duplicated_df["trade_id"] = [6, 7, 7, 8]
+    duplicated_df["timestamp"] = [
+        dt.datetime(2023, 1, 1, 10, 21, 0),
+        dt.datetime(2023, 1, 1, 10, 22, 0),
+        dt.datetime(2023, 1, 1, 10, 22, 0),
+        dt.datetime(2023, 1, 1, 10, 23, 0),
+    ]
+    write_trades(test_data_dir, market_type, symbol, duplicated_df, overwrite=False)
+
+    # 读取数据
+    start_time = dt.datetime(2023, 1, 1, 10, 0, 0)
+    end_time = dt.datetime(2023, 1, 1, 10, 30, 0)
+    read_df = read_trades(test_data_dir, market_type, symbol, start_time, end_time)
+
+    # 验证数据完整、无重复且按时间排序
+    assert list(read_df.trade_id) == [1, 2, 3, 4, 5, 6, 7, 8]
+    assert read_df.timestamp.is_monotonic_increasing
+
+
+def test_write_trades_rejects_sub_microsecond(test_data_dir, sample_trades_df):
+    """测试带有亚微秒部分的时间戳会被明确拒绝，而不是静默截断。
+
+    Args:
+        test_data_dir: 测试数据目录
+        sample_trades_df: 样本交易数据
+    """
+    trades_df = sample_trades_df.copy()
+    trades_df["timestamp"] = trades_df["timestamp"] + pd.Timedelta(nanoseconds=1)
+
+    with pytest.raises(ValueError, match="timestamp"):
+        write_trades(test_data_dir, MarketType.SPOT, "BTCUSDT", trades_df)
@@ -0,0 +1,250 @@
+"""测试 get_net_taker_volume 模块的功能。"""
+
+import datetime as dt
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import get_net_taker_volume
+from get_net_taker_volume import (
+    ResampleFrequency,
+    calculate_net_taker_volume,
+    process_date_range,
+)
+from src.aggtrades_fetcher import MarketType
+from src.aggtrades_store import get_file_path, write_trades
+
+
+@pytest.fixture
+def sample_trades_df():
+    """创建样本交易数据。
+
+    Returns:
+        包含一天随机交易数据的 DataFrame，按时间排序
+    """
+    rng = np.random.default_rng(42)
+    num_trades = 5000
+    offsets = np.sort(rng.integers(0, 86_400_000, num_trades))
+    data = {
+        "trade_id": np.arange(num_trades),
+        "timestamp": pd.Timestamp("2023-01-01", tz="UTC")
+        + pd.to_timedelta(offsets, unit="ms"),
+        "price": rng.uniform(99.0, 101.0, num_trades),
+        "quantity": rng.uniform(0.01, 2.0, num_trades),
+        "is_buyer_maker": rng.random(num_trades) < 0.5,
+    }
+    return pd.DataFrame(data)
+
+
+def _reference_net_taker_volume(
+    trades: pd.DataFrame, frequency: ResampleFrequency
+) -> pd.DataFrame:
+    """使用 pandas.resample 计算参考结果。
+
+    Args:
+        trades: 样本交易数据
+        frequency: 重采样频率
+
+    Returns:
+        参考结果 DataFrame
+    """
+    signed_quantity = trades["quantity"].where(
+        ~trades["is_buyer_maker"], -trades["quantity"]
+    )
+    return (
+        trades.assign(signed_quantity=signed_quantity)
+        .set_index("timestamp")
+        .resample(frequency.value)
+        .agg(
+            open=("price", "first"),
+            high=("price", "max"),
+            low=("price", "min"),
+            close=("price", "last"),
+            volume=("quantity", "sum"),
+            net_taker_volume=("signed_quantity", "sum"),
+        )
+    )
+
+
+@pytest.mark.parametrize(
+    "frequency",
+    [
+        ResampleFrequency.FIVE_MINUTES,
+        ResampleFrequency.ONE_HOUR,
+        ResampleFrequency.ONE_DAY,
+    ],
+)
+@pytest.mark.parametrize("tz", ["UTC", "Asia/Shanghai", "Asia/Kolkata"])
+def test_calculate_net_taker_volume(sample_trades_df, frequency, tz):
+    """测试净吃单量计算结果与 resample 参考结果一致。
+
+    非UTC时区的区间应从本地零点开始划分，与 resample 保持一致。
+
+    Args:
+        sample_trades_df: 样本交易数据
+        frequency: 重采样频率
+        tz: 交易时间戳的时区
+    """
+    trades = sample_trades_df.assign(
+        timestamp=sample_trades_df["timestamp"].dt.tz_convert(tz)
+    )
+
+    result = calculate_net_taker_volume(trades, frequency)
+    expected = _reference_net_taker_volume(trades, frequency)
+
+    pd.testing.assert_frame_equal(result, expected, check_freq=False)
+
+
+def test_calculate_net_taker_volume_sign(sample_trades_df):
+    """测试买入吃单计为正，卖出吃单计为负。
+
+    Args:
+        sample_trades_df: 样本交易数据
+    """
+    trades = sample_trades_df.iloc[:2].copy()
+    trades["quantity"] = [1.0, 3.0]
+    trades["is_buyer_maker"] = [False, True]
+
+    result = calculate_net_taker_volume(trades, ResampleFrequency.ONE_DAY)
+
+    assert result["volume"].iloc[0] == pytest.approx(4.0)
+    assert result["net_taker_volume"].iloc[0] == pytest.approx(-2.0)
+
+
+def test_calculate_net_taker_volume_unsorted(sample_trades_df):
+    """测试输入数据未按时间排序时结果不变。
+
+    Args:
+        sample_trades_df: 样本交易数据
+    """
+    shuffled = sample_trades_df.sample(frac=1.0, random_state=0)
+
+    result = calculate_net_taker_volume(shuffled, ResampleFrequency.ONE_HOUR)
+    expected = calculate_net_taker_volume(sample_trades_df, ResampleFrequency.ONE_HOUR)
+
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def _process_sample_day(data_dir: str) -> pd.DataFrame:
+    """按小时计算样本交易日的净吃单量。
+
+    Args:
+        data_dir: 数据目录路径
+
+    Returns:
+        计算结果 DataFrame
+    """
+    return process_date_range(
+        data_dir,
+        "BTCUSDT",
+        dt.date(2023, 1, 1),
+        dt.date(2023, 1, 1),
+        MarketType.SPOT,
+        ResampleFrequency.ONE_HOUR,
+    )
+
+
+def test_process_date_range_uses_cache(tmp_path, sample_trades_df, monkeypatch):
+    """测试第二次计算直接读取缓存，不再读取交易数据。
+
+    Args:
+        tmp_path: pytest 提供的临时目录路径
+        sample_trades_df: 样本交易数据
+        monkeypatch: pytest 提供的补丁工具
+    """
+    data_dir = str(tmp_path)
+    write_trades(data_dir, MarketType.SPOT, "BTCUSDT", sample_trades_df)
+
+    first = _process_sample_day(data_dir)
+    assert list((tmp_path / ".cache").rglob("*.parquet"))
+
+    # 交易数据无法读取时，结果只能来自缓存
+    def fail_read(data_path):
+        raise AssertionError("缓存命中时不应读取交易数据")
+
+    monkeypatch.setattr(get_net_taker_volume, "_read_trades_table", fail_read)
+    second = _process_sample_day(data_dir)
+
+    pd.testing.assert_frame_equal(second, first, check_freq=False)
+
+
+def test_process_date_range_invalidates_cache(tmp_path, sample_trades_df):
+    """测试交易数据文件重写后缓存失效，重新计算结果。
+
+    Args:
+        tmp_path: pytest 提供的临时目录路径
+        sample_trades_df: 样本交易数据
+    """
+    data_dir = str(tmp_path)
+    write_trades(data_dir, MarketType.SPOT, "BTCUSDT", sample_trades_df)
+    _process_sample_day(data_dir)
+
+    # 重写交易数据，并确保文件修改时间晚于缓存
+    updated_df = sample_trades_df.assign(quantity=sample_trades_df["quantity"] * 2)
+    write_trades(data_dir, MarketType.SPOT, "BTCUSDT", updated_df, overwrite=True)
+    data_path = get_file_path(data_dir, MarketType.SPOT, "BTCUSDT", dt.date(2023, 1, 1))
+    future = data_path.stat().st_mtime + 10
+    os.utime(data_path, (future, future))
+
+    result = _process_sample_day(data_dir)
+    expected = calculate_net_taker_volume(updated_df, ResampleFrequency.ONE_HOUR)
+
+    pd.testing.assert_frame_equal(result, expected, check_freq=False)
+
+
+def test_process_date_range_unwritable_cache(tmp_path, sample_trades_df):
+    """测试缓存目录无法创建时不使用缓存，仍然返回计算结果。
+
+    Args:
+        tmp_path: pytest 提供的临时目录路径
+        sample_trades_df: 样本交易数据
+    """
+    data_dir = str(tmp_path)
+    write_trades(data_dir, MarketType.SPOT, "BTCUSDT", sample_trades_df)
+
+    # 在缓存目录的位置放置普通文件，使缓存目录无法创建
+    (tmp_path / ".cache").write_text("")
+
+    result = _process_sample_day(data_dir)
+    expected = calculate_net_taker_volume(sample_trades_df, ResampleFrequency.ONE_HOUR)
+
+    pd.testing.assert_frame_equal(result, expected, check_freq=False)
+
+
+def test_save_result_csv_format(tmp_path):
+    """测试结果CSV的文本格式与 DataFrame.to_csv 一致，且读回后数据不变。
+
+    Args:
+        tmp_path: pytest 提供的临时目录路径
+    """
+    index = pd.date_range(
+        "2025-01-01", periods=2, freq="h", tz="Asia/Shanghai", name="timestamp"
+    )
+    result = pd.DataFrame(
+        [
+            [100.0, 101.5, 99.0, 100.25, 3.0, -0.5],
+            [100.25, 102.0, 100.0, 101.0, 1.0, 1.0],
+        ],
+        index=index,
+        columns=get_net_taker_volume.BAR_COLUMNS,
+    )
+    filename = tmp_path / "result.csv"
+
+    get_net_taker_volume.save_result_csv(result, str(filename))
+
+    assert filename.read_text().splitlines() == [
+        "timestamp,open,high,low,close,volume,net_taker_volume",
+        "2025-01-01 00:00:00+08:00,100.0,101.5,99.0,100.25,3.0,-0.5",
+        "2025-01-01 01:00:00+08:00,100.25,102.0,100.0,101.0,1.0,1.0",
+    ]
+    assert filename.read_text() == result.to_csv()
+    # 带偏移量的文本读回后是固定偏移时区，转换回原时区后再比较
+    read_back = pd.read_csv(filename, index_col=0, parse_dates=True)
+    read_back.index = read_back.index.tz_convert(index.tz)
+    pd.testing.assert_frame_equal(read_back, result, check_freq=False)